@@ -1,15 +1,31 @@
 import os
 import json
 import time
+import hashlib
+import asyncio
 import fcntl  # For file locking
-import tempfile  # For atomic writes
+import queue
 import sqlite3
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
 import logging
-from datetime import datetime, timedelta
-from collections import deque
+import logging.handlers
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from collections import deque, OrderedDict
 import random
 
+try:
+    import numpy as np
+except ImportError:  # Optional; scheduling falls back to the scalar path
+    np = None
+
+try:
+    import msgpack
+except ImportError:  # Optional; only the JSON state file is written without it
+    msgpack = None
+
 # Define base directory relative to the script's location
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -24,36 +40,123 @@ if not os.path.exists(LOG_DIR):
 # Define deterministic paths
 CONFIG_PATH = os.path.join(BASE_DIR, "../config/config.json")
 STATE_PATH = os.path.join(BASE_DIR, "../state/state.json")
+STATE_VERSION_PATH = os.path.join(BASE_DIR, "../state/state.version")
 CHAT_DB_PATH = "/Library/Messages/chat.db"  # Fixed path for iMessage database on macOS
 
-# Initialize logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+APPLE_EPOCH_UNIX = 978307200  # 2001-01-01T00:00:00Z, chat.db's date epoch
+
+# Chat-state fields held as unix-second floats at runtime. They are parsed
+# from ISO strings once at load and serialized back only when persisting, so
+# the poll loop never calls datetime.fromisoformat on a hot path.
+TIME_FIELDS = ("last_polled", "active_until", "last_name_check")
+
+def parse_utc_ts(iso_string):
+    """ISO string (naive UTC, as written to state.json) -> unix seconds."""
+    return datetime.fromisoformat(iso_string).replace(tzinfo=timezone.utc).timestamp()
+
+def format_utc_ts(ts):
+    """Unix seconds -> naive-UTC ISO string for state.json."""
+    return datetime.fromtimestamp(ts, tz=timezone.utc).replace(tzinfo=None).isoformat()
+
+# Queries are module constants so sqlite3's statement cache can reuse the
+# prepared statement across polls instead of re-parsing the SQL each call
+QUERY_ACTIVE_CHATS = """
+SELECT DISTINCT c.guid
+FROM message m
+JOIN chat_message_join cmj ON m.ROWID = cmj.message_id
+JOIN chat c ON c.ROWID = cmj.chat_id
+WHERE m.date > ?
+"""
+
+QUERY_NEW_MSGS = """
+SELECT
+    m.ROWID,
+    datetime(m.date/1000000000 + strftime('%s','2001-01-01'), 'unixepoch') AS message_time,
+    h.id,
+    m.text
+FROM chat c
+JOIN chat_message_join cmj ON c.ROWID = cmj.chat_id
+JOIN message m ON m.ROWID = cmj.message_id
+LEFT JOIN handle h ON m.handle_id = h.ROWID
+WHERE c.guid = ?
+AND m.ROWID > ?
+ORDER BY m.ROWID ASC
+"""
+
+# Initialize logging. Records go through an unbounded queue to a listener
+# thread that owns the real handlers, so a log call on the poll loop costs a
+# queue.put instead of a synchronous file write; delay=True defers opening
+# the log file until the first record reaches the listener.
+_log_queue = queue.Queue(-1)
+_log_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+_log_file_handler = logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=10 << 20, backupCount=5, delay=True)
+_log_file_handler.setFormatter(_log_formatter)
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(_log_formatter)
+logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(_log_queue)])
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_file_handler, _log_stream_handler)
+_log_listener.start()
 logger = logging.getLogger(__name__)
 
-# Retry decorator with exponential backoff
+DISCORD_API_BASE = "https://discord.com/api/v10"
+
+# Shared HTTP session so Discord calls reuse one keep-alive connection pool
+# instead of paying a TCP+TLS handshake per request. The async hot path uses
+# aiohttp below; this synchronous session remains for fatal-error reporting,
+# which must work even when the event loop is not running.
+_HTTP = requests.Session()
+_HTTP.mount("https://discord.com", HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=0))
+
+# Global cap on in-flight Discord requests across all channels
+MAX_CONCURRENT_SENDS = 64
+
+# Per-channel FIFO queues and their worker tasks. A channel's messages are
+# sent in order by its worker, while different channels overlap concurrently.
+_channel_queues = {}
+_channel_workers = {}
+
+# Rate-limit bookkeeping from Discord's X-RateLimit-* response headers so we
+# sleep before a bucket runs dry instead of burning a round-trip on a 429.
+# Channels sharing a bucket (X-RateLimit-Bucket) share one state entry.
+_route_buckets = {}  # route key -> bucket id
+_bucket_state = {}   # bucket id -> (remaining, reset monotonic timestamp)
+
+def _update_bucket_state(route, headers):
+    bucket = headers.get("X-RateLimit-Bucket", route)
+    _route_buckets[route] = bucket
+    remaining = headers.get("X-RateLimit-Remaining")
+    reset_after = headers.get("X-RateLimit-Reset-After")
+    if remaining is not None and reset_after is not None:
+        _bucket_state[bucket] = (int(remaining), time.monotonic() + float(reset_after))
+
+async def _wait_for_bucket(route):
+    bucket = _route_buckets.get(route)
+    if bucket is None:
+        return
+    remaining, reset_ts = _bucket_state.get(bucket, (1, 0.0))
+    delay = reset_ts - time.monotonic()
+    if remaining <= 0 and delay > 0:
+        logger.info(f"Rate-limit bucket {bucket} exhausted. Waiting {delay:.2f} seconds before next send...")
+        await asyncio.sleep(delay)
+
+# Retry decorator with exponential backoff and full jitter: attempt n sleeps
+# uniform(0, min(max_delay, base_delay * 2**n)), so callers that failed
+# together (e.g. after a chat.db or Discord outage) retry spread out instead
+# of in lockstep
 def exponential_backoff(retries=5, base_delay=1, max_delay=16, jitter=True):
     def decorator(func):
         def wrapper(*args, **kwargs):
-            delay = base_delay
-            for attempt in range(1, retries + 1):
+            for attempt in range(retries):
                 try:
                     return func(*args, **kwargs)
                 except Exception as e:
-                    if attempt == retries:
+                    if attempt == retries - 1:
                         logger.error(f"All {retries} attempts failed for {func.__name__}: {e}")
                         raise
-                    logger.warning(f"Attempt {attempt} failed for {func.__name__}: {e}. Retrying in {delay} seconds...")
-                    if jitter:
-                        delay += random.uniform(0, base_delay)  # Add jitter to avoid thundering herd
-                    time.sleep(min(delay, max_delay))
-                    delay *= 2  # Exponential backoff
+                    ceiling = min(max_delay, base_delay * (2 ** attempt))
+                    sleep = random.uniform(0, ceiling) if jitter else ceiling
+                    logger.warning(f"Attempt {attempt + 1} failed for {func.__name__}: {e}. Retrying in {sleep:.2f} seconds...")
+                    time.sleep(sleep)
         return wrapper
     return decorator
 
@@ -74,13 +177,13 @@ def load_json_with_backup(path):
 def notify_admin(bot_token, admin_channel_id, message):
     try:
         sanitized_message = message.replace("*", "\\*").replace("_", "\\_").replace("`", "\\`")
-        url = f"https://discord.com/api/v10/channels/{admin_channel_id}/messages"
+        url = f"{DISCORD_API_BASE}/channels/{admin_channel_id}/messages"
         headers = {
             "Authorization": f"Bot {bot_token}",
             "Content-Type": "application/json"
         }
         payload = {"content": f"**Fatal Error:** {sanitized_message}"}
-        requests.post(url, headers=headers, json=payload)
+        _HTTP.post(url, headers=headers, json=payload, timeout=10)
     except requests.RequestException as e:
         logger.error(f"Failed to notify admin: {e}")
 
@@ -96,23 +199,78 @@ def validate_config(config):
 # Retry database connection with exponential backoff
 @exponential_backoff(retries=5, base_delay=1, max_delay=16)
 def connect_to_database(path):
-    conn = sqlite3.connect(path)
-    conn.execute("PRAGMA journal_mode=WAL;")  # Enable Write-Ahead Logging
-    logger.info("Connected to the database with WAL mode enabled.")
+    # Open read-only: this process never writes chat.db, and mode=ro lets
+    # SQLite skip rollback-journal handling. The db is already in WAL mode
+    # (Messages.app keeps it there), so reads run concurrently with its writer.
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, cached_statements=256)
+    # A larger statement cache keeps the module-constant queries prepared
+    # between polls; the remaining pragmas keep hot B-tree pages in RAM and
+    # avoid SQLITE_BUSY against Messages.app
+    conn.execute("PRAGMA busy_timeout=5000;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute("PRAGMA cache_size=-40000;")    # 40MB page cache
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    conn.execute("PRAGMA mmap_size=268435456;")  # 256MB mmap
+    conn.execute("PRAGMA read_uncommitted=1;")   # forwarder only reads
+    try:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_message_date ON message(date)")
+    except sqlite3.OperationalError:
+        # Read-only mount; the stock chat.db already ships a date index
+        pass
+    logger.info("Connected to the database read-only with WAL mode.")
     return conn
 
-def get_display_name(chat_db, handle_id):
+class ReaderPool:
+    """Pool of read-only chat.db connections.
+
+    WAL lets any number of readers run alongside Messages.app's writer, so
+    the pool is sized to the CPU count to leave headroom for pushing DB reads
+    onto worker threads later. Check a connection out with:
+
+        with readers.connection() as conn:
+            ...
+
+    If state ever moves into SQLite, writes should go through one long-lived
+    writer connection (not pooled) with BEGIN IMMEDIATE transactions.
+    """
+
+    def __init__(self, path, size=None):
+        self._connections = queue.Queue()
+        for _ in range(size or os.cpu_count() or 1):
+            self._connections.put(connect_to_database(path))
+
+    @contextmanager
+    def connection(self):
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+# Display-name cache for change detection, bounded so a long-lived process
+# cannot grow it without limit; least-recently-seen handles fall out first
+DISPLAY_NAME_CACHE_MAX = 2048
+_display_names = OrderedDict()
+
+def remember_display_name(handle, name):
+    _display_names[handle] = name
+    _display_names.move_to_end(handle)
+    if len(_display_names) > DISPLAY_NAME_CACHE_MAX:
+        _display_names.popitem(last=False)
+
+# Handle lookups used to run one SELECT per message; the whole handle table
+# is small, so load it once and refresh on an interval instead
+HANDLE_CACHE_REFRESH_SECONDS = 300
+
+def load_handle_cache(readers):
     try:
-        query = "SELECT id FROM handle WHERE id = ?"
-        cursor = chat_db.cursor()
-        cursor.execute(query, (handle_id,))
-        result = cursor.fetchone()
-        return result[0] if result else handle_id
+        with readers.connection() as chat_db:
+            return {row[0]: row[0] for row in chat_db.execute("SELECT DISTINCT id FROM handle")}
     except sqlite3.Error as e:
-        logger.error(f"Database error while fetching display name for handle_id {handle_id}: {e}")
-        return handle_id
+        logger.error(f"Database error while loading handle cache: {e}")
+        return {}
 
-def get_chat_participants(chat_db, chat_guid):
+def get_chat_participants(readers, chat_guid):
     try:
         query = """
         SELECT h.id
@@ -121,106 +279,184 @@ def get_chat_participants(chat_db, chat_guid):
         JOIN handle h ON chj.handle_id = h.ROWID
         WHERE c.guid = ?
         """
-        cursor = chat_db.cursor()
-        cursor.execute(query, (chat_guid,))
-        return [row[0] for row in cursor.fetchall()]
+        with readers.connection() as chat_db:
+            cursor = chat_db.cursor()
+            cursor.execute(query, (chat_guid,))
+            return [row[0] for row in cursor.fetchall()]
     except sqlite3.Error as e:
         logger.error(f"Database error while fetching participants for chat {chat_guid}: {e}")
         return []
 
-def create_discord_channel(bot_token, guild_id, name, participants):
+async def post_json(session, url, payload):
+    """POST a JSON payload and return (status, headers, body)."""
+    async with session.post(url, json=payload) as response:
+        try:
+            body = await response.json()
+        except (aiohttp.ContentTypeError, ValueError):
+            body = await response.text()
+        return response.status, response.headers, body
+
+async def create_discord_channel(session, send_sem, guild_id, name, participants):
     try:
-        url = f"https://discord.com/api/v10/guilds/{guild_id}/channels"
-        headers = {
-            "Authorization": f"Bot {bot_token}",
-            "Content-Type": "application/json"
-        }
+        url = f"{DISCORD_API_BASE}/guilds/{guild_id}/channels"
         channel_name = name.lower().replace(" ", "-")[:100]
         payload = {
             "name": channel_name,
             "type": 0
         }
-        response = requests.post(url, headers=headers, json=payload)
-        if response.status_code == 201:
-            channel = response.json()
-            logger.info(f"Created Discord channel: {channel['name']} (ID: {channel['id']})")
-            return channel["id"]
+        async with send_sem:
+            status, headers, body = await post_json(session, url, payload)
+        if status == 201:
+            logger.info(f"Created Discord channel: {body['name']} (ID: {body['id']})")
+            return body["id"]
         else:
-            logger.error(f"Failed to create channel: {response.status_code} - {response.text}")
+            logger.error(f"Failed to create channel: {status} - {body}")
             return None
-    except requests.RequestException as e:
+    except aiohttp.ClientError as e:
         logger.error(f"HTTP error while creating Discord channel: {e}")
         return None
 
-def send_to_discord_channel(bot_token, channel_id, content):
+async def send_to_discord_channel(session, send_sem, channel_id, content):
     try:
-        url = f"https://discord.com/api/v10/channels/{channel_id}/messages"
-        headers = {
-            "Authorization": f"Bot {bot_token}",
-            "Content-Type": "application/json"
-        }
+        url = f"{DISCORD_API_BASE}/channels/{channel_id}/messages"
+        route = f"POST {channel_id}"
         payload = {"content": content}
         while True:
-            response = requests.post(url, headers=headers, json=payload)
-            if response.status_code == 200 or response.status_code == 204:
+            await _wait_for_bucket(route)
+            async with send_sem:
+                status, headers, body = await post_json(session, url, payload)
+            _update_bucket_state(route, headers)
+            if status == 200 or status == 204:
                 return True  # Message sent successfully
-            elif response.status_code == 429:  # Rate-limited
-                retry_after = float(response.headers.get("Retry-After", 1))  # Default to 1 second if missing
+            elif status == 429:  # Rate-limited
+                retry_after = float(headers.get("Retry-After", 1))  # Default to 1 second if missing
                 logger.warning(f"Rate-limited by Discord. Retrying after {retry_after} seconds...")
-                time.sleep(retry_after)
+                await asyncio.sleep(retry_after)
             else:
-                logger.error(f"Failed to send message to Discord channel {channel_id}: {response.status_code} - {response.text}")
+                logger.error(f"Failed to send message to Discord channel {channel_id}: {status} - {body}")
                 return False
-    except requests.RequestException as e:
+    except aiohttp.ClientError as e:
         logger.error(f"HTTP error while sending message to Discord channel {channel_id}: {e}")
         return False
 
-def get_active_chats(chat_db, since_time):
+async def _drain_channel_queue(session, send_sem, channel_id, queue):
+    """Worker that sends one channel's queued messages in FIFO order."""
+    while True:
+        content = await queue.get()
+        try:
+            await send_to_discord_channel(session, send_sem, channel_id, content)
+        finally:
+            queue.task_done()
+
+def enqueue_discord_send(session, send_sem, channel_id, content):
+    """Queue a message for a channel, spawning its worker on first use.
+
+    Per-channel ordering is preserved by the worker; messages for different
+    channels are sent concurrently up to MAX_CONCURRENT_SENDS in flight.
+    """
+    queue = _channel_queues.get(channel_id)
+    if queue is None:
+        queue = asyncio.Queue()
+        _channel_queues[channel_id] = queue
+        _channel_workers[channel_id] = asyncio.create_task(
+            _drain_channel_queue(session, send_sem, channel_id, queue)
+        )
+    queue.put_nowait(content)
+
+# Whitelist-filtered variants of QUERY_ACTIVE_CHATS, keyed by whitelist
+# cardinality so repeated calls hit the sqlite3 statement cache
+_active_chats_sql = {}
+
+def get_active_chats(readers, since_ts, whitelisted_chats=frozenset()):
     try:
-        query = f"""
-        SELECT
-            c.guid,
-            MAX(m.date) as last_date
-        FROM chat c
-        JOIN chat_message_join cmj ON c.ROWID = cmj.chat_id
-        JOIN message m ON m.ROWID = cmj.message_id
-        GROUP BY c.guid
-        HAVING last_date > {(since_time - datetime(2001, 1, 1)).timestamp()}
-        """
-        cursor = chat_db.cursor()
-        cursor.execute(query)
-        return [row[0] for row in cursor.fetchall()]
+        # Filter on message.date in WHERE so SQLite can prune via its date
+        # index instead of aggregating the full message history; a non-empty
+        # whitelist is applied DB-side so filtered rows never reach Python
+        cutoff_ns = int((since_ts - APPLE_EPOCH_UNIX) * 1e9)
+        if whitelisted_chats:
+            query = _active_chats_sql.get(len(whitelisted_chats))
+            if query is None:
+                placeholders = ",".join("?" * len(whitelisted_chats))
+                query = f"{QUERY_ACTIVE_CHATS} AND c.guid IN ({placeholders})"
+                _active_chats_sql[len(whitelisted_chats)] = query
+            params = (cutoff_ns, *whitelisted_chats)
+        else:
+            query = QUERY_ACTIVE_CHATS
+            params = (cutoff_ns,)
+        with readers.connection() as chat_db:
+            cursor = chat_db.cursor()
+            cursor.execute(query, params)
+            return [row[0] for row in cursor.fetchall()]
     except sqlite3.OperationalError as e:
         if "database is locked" in str(e).lower():
             logger.warning("Database locked while fetching active chats. Retrying...")
         return []
 
-def get_new_messages(chat_db, guid, last_seen_rowid):
+def get_new_messages(readers, guid, last_seen_rowid):
+    """Yield new messages for a chat in ROWID order.
+
+    Rows stream out in fetchmany batches so memory stays bounded and the
+    caller can start enqueuing Discord sends before the read completes.
+    """
     try:
-        query = f"""
-        SELECT
-            m.ROWID,
-            datetime(m.date/1000000000 + strftime('%s','2001-01-01'), 'unixepoch') AS message_time,
-            h.id,
-            m.text
-        FROM chat c
-        JOIN chat_message_join cmj ON c.ROWID = cmj.chat_id
-        JOIN message m ON m.ROWID = cmj.message_id
-        LEFT JOIN handle h ON m.handle_id = h.ROWID
-        WHERE c.guid = ?
-        AND m.ROWID > ?
-        ORDER BY m.ROWID ASC
-        """
-        cursor = chat_db.cursor()
-        cursor.execute(query, (guid, last_seen_rowid))
-        return cursor.fetchall()
+        with readers.connection() as chat_db:
+            cursor = chat_db.cursor()
+            cursor.execute(QUERY_NEW_MSGS, (guid, last_seen_rowid))
+            while batch := cursor.fetchmany(256):
+                yield from batch
     except sqlite3.Error as e:
         logger.error(f"Database error while fetching new messages for chat {guid}: {e}")
-        return []
 
-def burst_check(message_times, now, threshold_count, window_seconds):
-    cutoff = now - timedelta(seconds=window_seconds)
-    while message_times and datetime.fromisoformat(message_times[0]) < cutoff:
+def select_due_chats(chat_items, now_ts, burst_poll, active_poll, default_poll):
+    """Decide which chats are due to poll and the soonest future deadline.
+
+    chat_items is a list of (guid, chat_state) pairs. Returns (due, soonest):
+    the pairs to poll this tick and the earliest next-poll timestamp among
+    the rest (None if every chat is due). Each chat's poll_interval is
+    updated as a side effect. With NumPy available and enough chats, the
+    interval selection and deadline comparison run as a few vectorised array
+    operations instead of one Python iteration per chat.
+    """
+    if np is not None and len(chat_items) >= 8:
+        n = len(chat_items)
+        last_polled = np.fromiter((cs["last_polled"] for _, cs in chat_items), np.float64, n)
+        active_until = np.fromiter((cs.get("active_until", 0.0) for _, cs in chat_items), np.float64, n)
+        burst_mode = np.fromiter((cs["burst_mode"] for _, cs in chat_items), np.bool_, n)
+        interval = np.where(burst_mode, burst_poll, np.where(now_ts <= active_until, active_poll, default_poll))
+        next_poll = last_polled + interval
+        due_mask = next_poll <= now_ts
+        for (_, chat_state), chat_interval in zip(chat_items, interval.tolist()):
+            chat_state["poll_interval"] = chat_interval
+        pending = next_poll[~due_mask]
+        soonest = float(pending.min()) if pending.size else None
+        due = [item for item, is_due in zip(chat_items, due_mask.tolist()) if is_due]
+        return due, soonest
+
+    due = []
+    soonest = None
+    for guid, chat_state in chat_items:
+        if chat_state["burst_mode"]:
+            interval = burst_poll
+        elif now_ts <= chat_state.get("active_until", 0.0):
+            interval = active_poll
+        else:
+            interval = default_poll
+        chat_state["poll_interval"] = interval
+        next_poll = chat_state["last_polled"] + interval
+        if next_poll <= now_ts:
+            due.append((guid, chat_state))
+        elif soonest is None or next_poll < soonest:
+            soonest = next_poll
+    return due, soonest
+
+def burst_check(message_times, now_ts, threshold_count, window_seconds):
+    """Trim expired entries in place and report whether the chat is bursting.
+
+    message_times holds unix-second floats, parsed once at ingest, so this
+    is pure float comparison with no per-element datetime work.
+    """
+    cutoff = now_ts - window_seconds
+    while message_times and message_times[0] < cutoff:
         message_times.popleft()
     return len(message_times) >= threshold_count
 
@@ -242,45 +478,88 @@ def read_state_file(state_path, retries=10, delay=0.1):
                 logger.error("Failed to acquire shared lock on state file after multiple attempts.")
                 raise
 
-# Write the state file atomically with an exclusive lock and retries
-def write_state_file(state_path, data, retries=10, delay=0.1):
-    temp_dir = os.path.dirname(state_path)
-    with tempfile.NamedTemporaryFile("w", dir=temp_dir, delete=False) as tmp:
-        json.dump(data, tmp, indent=2)
-        tmp.flush()
-        os.fsync(tmp.fileno())  # Ensure data is written to disk
-        temp_path = tmp.name
-
-    for attempt in range(1, retries + 1):
+# Bump the state version sidecar after each state.json publish. Readers
+# compare this single integer (like SQLite's PRAGMA data_version) to decide
+# whether a reload is needed, instead of re-parsing state.json on every
+# filesystem event.
+def bump_state_version():
+    temp_path = STATE_VERSION_PATH + ".tmp"
+    try:
+        with open(temp_path, "w") as f:
+            f.write(str(time.time_ns()))
+        os.replace(temp_path, STATE_VERSION_PATH)
+    except OSError as e:
+        logger.warning(f"Failed to bump state version sidecar: {e}")
+
+# Digest of the last state payload written, used to skip the fsync+rename
+# entirely when a write would publish identical bytes
+_last_state_sha = b""
+
+# Write the state file atomically: exclusive temp file, one fsync, then an
+# atomic os.replace. The forwarder is the single writer, so no lock is
+# needed — readers always see either the old or the new complete file.
+def _publish_atomically(path, payload):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(temp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+    try:
         try:
-            with open(state_path, "a") as f:
-                fcntl.flock(f, fcntl.LOCK_EX)  # Acquire an exclusive lock
-                try:
-                    os.rename(temp_path, state_path)  # Atomically replace the file
-                    return
-                finally:
-                    fcntl.flock(f, fcntl.LOCK_UN)  # Release the lock
-        except BlockingIOError:
-            if attempt < retries:
-                logger.warning(f"State file locked for writing (attempt {attempt}/{retries}). Retrying in {delay} seconds...")
-                time.sleep(delay)
-            else:
-                logger.error("Failed to acquire exclusive lock on state file after multiple attempts.")
-                raise
-
-def main():
+            os.write(fd, payload)
+            os.fsync(fd)  # Ensure data is on disk before it becomes visible
+        finally:
+            os.close(fd)
+        os.replace(temp_path, path)
+    except OSError:
+        # Never leave the O_EXCL temp behind: a stale one (e.g. after a
+        # transient ENOSPC) would make every later publish fail with
+        # FileExistsError for the rest of the process lifetime
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+def write_state_file(state_path, data):
+    global _last_state_sha
+    payload = json.dumps(data, indent=2).encode()
+    digest = hashlib.sha256(payload).digest()
+    if digest == _last_state_sha:
+        return  # Identical to what is already on disk
+    _publish_atomically(state_path, payload)
+    if msgpack is not None:
+        # Binary sidecar for the responder's hot reload path; msgpack parses
+        # far faster than JSON. Published after state.json so its mtime is at
+        # least as new — the reader only trusts a sidecar that isn't older
+        # than the JSON, which keeps a stale one (left by a run without
+        # msgpack installed) from shadowing fresh state.
+        sidecar = os.path.splitext(state_path)[0] + ".msgpack"
+        _publish_atomically(sidecar, msgpack.packb(data, use_bin_type=True))
+    bump_state_version()
+    _last_state_sha = digest
+
+async def main():
     # Load configuration
     config = load_json_with_backup(CONFIG_PATH)
     if not validate_config(config):
         logger.critical("Invalid configuration. Exiting.")
         return
 
+    # Twice the burst trigger is plenty of history to decide burst mode
+    times_maxlen = config.get("burst_trigger_count", 8) * 2
+
     # Load state with locking
     try:
         state = read_state_file(STATE_PATH)
-        # Convert message_times to deque for all chats
+        # Convert persisted ISO strings to unix-second floats for all chats;
+        # the loop works exclusively in floats
         for chat_guid, chat_state in state.get("chats", {}).items():
-            chat_state["message_times"] = deque(chat_state.get("message_times", []), maxlen=100)
+            chat_state["message_times"] = deque(
+                (ts if isinstance(ts, (int, float)) else parse_utc_ts(ts)
+                 for ts in chat_state.get("message_times", [])),
+                maxlen=times_maxlen
+            )
+            for field in TIME_FIELDS:
+                value = chat_state.get(field, 0.0)
+                chat_state[field] = value if isinstance(value, (int, float)) else parse_utc_ts(value)
     except Exception as e:
         logger.critical(f"Failed to load state.json with locking: {e}")
         state = {"chats": {}}
@@ -289,18 +568,9 @@ def main():
     if "chats" not in state:
         state["chats"] = {}
 
-    # Load configuration values
-    webhook_url = config.get("discord_webhook_url")
+    # Load configuration values needed before the poll loop starts
     bot_token = config["discord_bot_token"]
-    guild_id = config["default_guild_id"]
     admin_channel_id = config.get("admin_channel_id")  # Optional: for notifications
-    whitelisted_chats = config.get("whitelisted_chats", [])
-    burst_trigger_count = config.get("burst_trigger_count", 8)
-    burst_window_seconds = config.get("burst_window_seconds", 10)
-    burst_poll_interval = config.get("burst_poll_interval", 0.5)
-    active_poll_interval = config.get("active_poll_interval", 10)
-    default_poll_interval = config.get("default_poll_interval", 30)
-    discovery_interval = config.get("global_discovery_interval", 15)
 
     # Check if the iMessage database exists
     if not os.path.exists(CHAT_DB_PATH):
@@ -311,118 +581,164 @@ def main():
 
     # Connect to the iMessage database
     try:
-        conn = connect_to_database(CHAT_DB_PATH)
+        readers = ReaderPool(CHAT_DB_PATH)
     except sqlite3.Error as e:
         logger.critical(f"Failed to connect to iMessage database: {e}")
         if admin_channel_id:
             notify_admin(bot_token, admin_channel_id, f"Failed to connect to iMessage database: {e}")
         return
 
+    # One keep-alive connection pool for all Discord traffic; auth headers are
+    # set once here instead of per request
+    connector = aiohttp.TCPConnector(limit=64, limit_per_host=64, ttl_dns_cache=300)
+    send_sem = asyncio.Semaphore(MAX_CONCURRENT_SENDS)
+    async with aiohttp.ClientSession(
+        connector=connector,
+        headers={
+            "Authorization": f"Bot {bot_token}",
+            "Content-Type": "application/json"
+        }
+    ) as session:
+        await poll_loop(session, send_sem, readers, config, state)
+
+async def poll_loop(session, send_sem, readers, config, state):
+    guild_id = config["default_guild_id"]
+    # frozenset for O(1) membership tests on every poll
+    whitelisted_chats = frozenset(config.get("whitelisted_chats", []))
+    burst_trigger_count = config.get("burst_trigger_count", 8)
+    burst_window_seconds = config.get("burst_window_seconds", 10)
+    burst_poll_interval = config.get("burst_poll_interval", 0.5)
+    active_poll_interval = config.get("active_poll_interval", 10)
+    default_poll_interval = config.get("default_poll_interval", 30)
+    discovery_interval = config.get("global_discovery_interval", 15)
+
+    handle_cache = load_handle_cache(readers)
+    handle_cache_loaded = time.monotonic()
+
     while True:
-        now = datetime.utcnow()
+        now_ts = time.time()
+        # Only persist when something durable changed this pass; idle ticks
+        # (which only bump last_polled) are not worth a full rewrite+fsync
+        state_dirty = False
         if state.get("last_global_poll") is None:
-            state["last_global_poll"] = (now - timedelta(days=1)).isoformat()
+            state["last_global_poll"] = now_ts - 86400
 
         # Perform global discovery at intervals
-        if (now - datetime.fromisoformat(state["last_global_poll"])).total_seconds() >= discovery_interval:
-            active_chats = get_active_chats(conn, now - timedelta(days=1))
+        if now_ts - state["last_global_poll"] >= discovery_interval:
+            # The whitelist is applied inside the query, so every returned
+            # guid is already eligible
+            active_chats = get_active_chats(readers, now_ts - 86400, whitelisted_chats)
             for chat_guid in active_chats:
-                if whitelisted_chats and chat_guid not in whitelisted_chats:
-                    continue
+                if chat_guid not in state["chats"]:
+                    state_dirty = True
                 chat_state = state["chats"].setdefault(chat_guid, {
                     "last_seen_rowid": 0,
                     "poll_interval": default_poll_interval,
-                    "message_times": deque(maxlen=100),  # Initialize as deque
+                    "message_times": deque(maxlen=burst_trigger_count * 2),  # Unix-second floats
                     "burst_mode": False,
-                    "last_polled": "1970-01-01T00:00:00",
-                    "active_until": now.isoformat(),
-                    "last_name_check": "1970-01-01T00:00:00"
+                    "last_polled": 0.0,
+                    "active_until": now_ts,
+                    "last_name_check": 0.0
                 })
                 if "discord_channel_id" not in chat_state:
-                    participants = get_chat_participants(conn, chat_guid)
+                    participants = get_chat_participants(readers, chat_guid)
                     channel_name = "chat-" + "-".join(p.split("@")[0] for p in participants)[:80]
-                    channel_id = create_discord_channel(bot_token, guild_id, channel_name, participants)
+                    channel_id = await create_discord_channel(session, send_sem, guild_id, channel_name, participants)
                     if channel_id:
                         chat_state["discord_channel_id"] = str(channel_id)
                         welcome = f"[Bridge initialized for iMessage chat with: {', '.join(participants)}]"
-                        send_to_discord_channel(bot_token, channel_id, welcome)
-                        try:
-                            write_state_file(STATE_PATH, state)
-                        except Exception as e:
-                            logger.error(f"Failed to update state.json with locking: {e}")
-            state["last_global_poll"] = now.isoformat()
-
-        soonest_next_poll = now + timedelta(seconds=default_poll_interval)
-
-        for chat_guid, chat_state in state["chats"].items():
-            if whitelisted_chats and chat_guid not in whitelisted_chats:
-                continue
-
-            # Determine the chat's state and set the polling interval
-            active_until = datetime.fromisoformat(chat_state.get("active_until", "1970-01-01T00:00:00"))
-            if chat_state["burst_mode"]:
-                chat_state["poll_interval"] = burst_poll_interval
-            elif now <= active_until:
-                chat_state["poll_interval"] = active_poll_interval
-            else:
-                chat_state["poll_interval"] = default_poll_interval
-
-            # Calculate the next poll time
-            next_poll_time = datetime.fromisoformat(chat_state["last_polled"]) + timedelta(seconds=chat_state["poll_interval"])
-            if next_poll_time < now:
-                next_poll_time = now + timedelta(seconds=chat_state["poll_interval"])
-            if now < next_poll_time:
-                soonest_next_poll = min(soonest_next_poll, next_poll_time)
-                continue
-
-            # Fetch new messages for the chat
-            messages = get_new_messages(conn, chat_guid, chat_state["last_seen_rowid"])
-            chat_state["last_polled"] = now.isoformat()
+                        enqueue_discord_send(session, send_sem, channel_id, welcome)
+                        state_dirty = True
+            state["last_global_poll"] = now_ts
+
+        soonest_next_poll = now_ts + default_poll_interval
+
+        # Pick due chats (and the next wake-up deadline) in one pass
+        chat_items = [
+            (chat_guid, chat_state)
+            for chat_guid, chat_state in state["chats"].items()
+            if not whitelisted_chats or chat_guid in whitelisted_chats
+        ]
+        due_chats, soonest_pending = select_due_chats(
+            chat_items, now_ts, burst_poll_interval, active_poll_interval, default_poll_interval
+        )
+        if soonest_pending is not None:
+            soonest_next_poll = min(soonest_next_poll, soonest_pending)
+
+        async def process_chat(chat_guid, chat_state):
+            nonlocal state_dirty, handle_cache, handle_cache_loaded
+
+            # Fetch new messages for the chat; rows stream straight into the
+            # channel queue as they arrive
+            messages = get_new_messages(readers, chat_guid, chat_state["last_seen_rowid"])
+            chat_state["last_polled"] = now_ts
 
             for rowid, timestamp, sender, text in messages:
                 if text:
+                    state_dirty = True
                     channel_id = chat_state.get("discord_channel_id")
                     if channel_id:
-                        send_to_discord_channel(bot_token, channel_id, f"[{sender} @ {timestamp}]: {text}")
+                        enqueue_discord_send(session, send_sem, channel_id, f"[{sender} @ {timestamp}]: {text}")
                     chat_state["last_seen_rowid"] = rowid
-                    chat_state["active_until"] = (now + timedelta(minutes=10)).isoformat()
-                    chat_state["message_times"].append(timestamp)  # Append to deque
+                    chat_state["active_until"] = now_ts + 600  # Active for 10 minutes
+                    # Parse the ISO timestamp once at ingest; the deque holds floats
+                    chat_state["message_times"].append(parse_utc_ts(timestamp))
 
                     # Check for name changes
-                    last_name_check = datetime.fromisoformat(chat_state.get("last_name_check", "1970-01-01T00:00:00"))
-                    name_check_interval = timedelta(minutes=1 if chat_state["burst_mode"] else 5)
-                    if now - last_name_check >= name_check_interval:
-                        current_name = get_display_name(conn, sender or "You")
-                        cached_name = state.setdefault("display_names", {}).get(sender, current_name)
+                    name_check_interval = 60 if chat_state["burst_mode"] else 300
+                    if now_ts - chat_state.get("last_name_check", 0.0) >= name_check_interval:
+                        if time.monotonic() - handle_cache_loaded >= HANDLE_CACHE_REFRESH_SECONDS:
+                            handle_cache = load_handle_cache(readers)
+                            handle_cache_loaded = time.monotonic()
+                        current_name = handle_cache.get(sender or "You", sender or "You")
+                        cached_name = _display_names.get(sender, current_name)
                         if current_name != cached_name:
-                            state["display_names"][sender] = current_name
                             name_change_notice = f"[{sender} is now known as {current_name}.]"
-                            send_to_discord_channel(bot_token, channel_id, name_change_notice)
-                        chat_state["last_name_check"] = now.isoformat()
-
-            # Update burst mode and message times
-            times = deque(chat_state["message_times"], maxlen=100)
-            chat_state["burst_mode"] = burst_check(times, now, burst_trigger_count, burst_window_seconds)
-            chat_state["message_times"] = list(times)
-
-        # Save state after processing all chats with locking
-        state_to_save = {
-            "chats": {
-                chat_guid: {
-                    **chat_state,
-                    "message_times": list(chat_state["message_times"])  # Convert deque to list here
+                            enqueue_discord_send(session, send_sem, channel_id, name_change_notice)
+                        remember_display_name(sender, current_name)
+                        chat_state["last_name_check"] = now_ts
+
+            # Update burst mode; the deque is the authoritative structure and
+            # is trimmed in place, no per-poll copy
+            burst_mode = burst_check(chat_state["message_times"], now_ts, burst_trigger_count, burst_window_seconds)
+            if burst_mode != chat_state["burst_mode"]:
+                chat_state["burst_mode"] = burst_mode
+                state_dirty = True
+
+        # One awaitable batch per tick: every due chat's fetch-and-enqueue
+        # runs as its own task, and the per-channel workers drain the queues
+        # concurrently while we are still ingesting
+        if due_chats:
+            await asyncio.gather(*(process_chat(chat_guid, chat_state) for chat_guid, chat_state in due_chats))
+
+        # Save state after processing all chats with locking, skipping the
+        # rewrite entirely when no chat changed this pass
+        if state_dirty:
+            # Runtime floats are serialized back to ISO strings / lists only
+            # here, at persist time
+            state_to_save = {
+                "chats": {
+                    chat_guid: {
+                        **chat_state,
+                        **{field: format_utc_ts(chat_state[field])
+                           for field in TIME_FIELDS if field in chat_state},
+                        "message_times": list(chat_state["message_times"])  # Convert deque to list here
+                    }
+                    for chat_guid, chat_state in state["chats"].items()
                 }
-                for chat_guid, chat_state in state["chats"].items()
             }
-        }
-        try:
-            write_state_file(STATE_PATH, state_to_save)
-        except Exception as e:
-            logger.error(f"Failed to save state.json with locking: {e}")
+            try:
+                write_state_file(STATE_PATH, state_to_save)
+            except Exception as e:
+                logger.error(f"Failed to save state.json with locking: {e}")
 
-        # Sleep until the soonest next poll time
-        sleep_duration = max(0.1, (soonest_next_poll - datetime.utcnow()).total_seconds())
-        time.sleep(sleep_duration)
+        # Sleep until the soonest next poll time; queued Discord sends
+        # progress in the background while we wait
+        sleep_duration = max(0.1, soonest_next_poll - time.time())
+        await asyncio.sleep(sleep_duration)
 
 if __name__ == "__main__":
-    main()
+    try:
+        asyncio.run(main())
+    finally:
+        _log_listener.stop()  # Flush queued records before exit
@@ -1,12 +1,36 @@
 import os
 import json
 import asyncio
-import time  # For retry delays
 import fcntl  # For file locking
+import mmap
+import queue
 import discord
 import logging
+import logging.handlers
+from types import MappingProxyType
+
+try:
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+except ImportError:  # orjson is optional; stdlib json parses the same files
+    orjson = None
+
+    def _json_loads(data):
+        return json.loads(data)
+
+try:
+    import ijson
+except ImportError:  # ijson is optional; without it the state is parsed whole
+    ijson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; without it only state.json is read
+    msgpack = None
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from watchdog.events import PatternMatchingEventHandler
 
 # Define base directory relative to the script's location
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -21,21 +45,29 @@ if not os.path.exists(LOG_DIR):
 
 CONFIG_PATH = os.path.join(BASE_DIR, "../config/config.json")
 STATE_PATH = os.path.join(BASE_DIR, "../state/state.json")
+STATE_VERSION_PATH = os.path.join(BASE_DIR, "../state/state.version")
 
-# Initialize logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler(LOG_FILE), logging.StreamHandler()]
-)
+# Initialize logging. As in the forwarder, records go through an unbounded
+# queue to a listener thread that owns the real handlers, so a log call on the
+# event loop costs a queue.put instead of a synchronous file write; delay=True
+# defers opening the log file until the first record reaches the listener.
+_log_queue = queue.Queue(-1)
+_log_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+_log_file_handler = logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=10 << 20, backupCount=5, delay=True)
+_log_file_handler.setFormatter(_log_formatter)
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(_log_formatter)
+logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(_log_queue)])
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_file_handler, _log_stream_handler)
+_log_listener.start()
 logger = logging.getLogger(__name__)
 
 # Load JSON with backup for corrupted files
 def load_json_with_backup(path):
     try:
-        with open(path, "r") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
+        with open(path, "rb") as f:
+            return _json_loads(f.read())
+    except (FileNotFoundError, ValueError) as e:
         logger.error(f"Error loading JSON from {path}: {e}")
         backup_path = f"{path}.backup"
         if os.path.exists(path):
@@ -43,136 +75,518 @@ def load_json_with_backup(path):
             logger.warning(f"Backed up corrupted file to {backup_path}")
         return {"chats": {}}  # Initialize default state
 
-# Validate configuration
+# Validate configuration. A set difference reports every missing key in one
+# operation, however many the required set grows to.
+_REQUIRED_CONFIG_KEYS = frozenset({"discord_bot_token"})
+
 def validate_config(config):
-    required_keys = ["discord_bot_token"]
-    for key in required_keys:
-        if key not in config:
-            logger.critical(f"Missing required configuration key: {key}")
-            return False
+    missing = _REQUIRED_CONFIG_KEYS - config.keys()
+    if missing:
+        logger.critical(f"Missing required configuration keys: {', '.join(sorted(missing))}")
+        return False
     return True
 
 config = load_json_with_backup(CONFIG_PATH)
 if not validate_config(config):
     logger.critical("Invalid configuration. Exiting.")
-    exit(1)
+    raise SystemExit(1)
+
+# Cache of the last successful parse, keyed by the parsed file's identity
+# (path, size, mtime_ns) taken under the shared lock. Watchdog events can be
+# spurious — metadata touches, double-fires from an atomic rename — and this
+# short-circuits the re-parse when the bytes cannot have changed.
+_state_cache = (None, None)
+
+def _sidecar_is_fresh(state_path):
+    """True when a usable state.msgpack sits next to state.json.
+
+    The sidecar is written after the JSON, so it is trusted only when it is
+    at least as new — a stale one (left behind by a producer running without
+    msgpack) must not shadow fresh state.
+    """
+    if msgpack is None:
+        return False
+    sidecar = os.path.splitext(state_path)[0] + ".msgpack"
+    try:
+        return os.stat(sidecar).st_mtime_ns >= os.stat(state_path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+def _cached_parse(state_path):
+    """Return the cached state dict if it still matches the file, else None."""
+    key = _state_cache[0]
+    if key is None or key[0] != state_path:
+        return None
+    try:
+        st = os.stat(state_path)
+    except OSError:
+        return None
+    if (state_path, st.st_size, st.st_mtime_ns) == key:
+        return _state_cache[1]
+    return None
 
-# Read the state file with a shared lock and retries
-def read_state_file(state_path, retries=10, delay=0.1):
-    for attempt in range(1, retries + 1):
+# Read the state file with a shared lock
+def read_state_file(state_path):
+    # Prefer the binary sidecar the forwarder publishes next to state.json:
+    # msgpack decodes the same structure several times faster than JSON
+    # parsing
+    global _state_cache
+    if _sidecar_is_fresh(state_path):
+        sidecar = os.path.splitext(state_path)[0] + ".msgpack"
         try:
-            with open(state_path, "r") as f:
-                fcntl.flock(f, fcntl.LOCK_SH)  # Acquire a shared lock
+            with open(sidecar, "rb") as f:
+                fcntl.flock(f, fcntl.LOCK_SH)
                 try:
-                    return json.load(f)
+                    st = os.fstat(f.fileno())
+                    key = (sidecar, st.st_size, st.st_mtime_ns)
+                    if key == _state_cache[0]:
+                        return _state_cache[1]
+                    data = f.read()
                 finally:
-                    fcntl.flock(f, fcntl.LOCK_UN)  # Release the lock
-        except BlockingIOError:
-            if attempt < retries:
-                logger.warning(f"State file locked (attempt {attempt}/{retries}). Retrying in {delay} seconds...")
-                time.sleep(delay)
-            else:
-                logger.error("Failed to acquire shared lock on state file after multiple attempts.")
-                raise
+                    fcntl.flock(f, fcntl.LOCK_UN)
+            parsed = msgpack.unpackb(data, raw=False)
+            _state_cache = (key, parsed)
+            return parsed
+        except FileNotFoundError:
+            pass  # Unpublished between the freshness check and the open
+    # flock without LOCK_NB blocks until the lock is granted, so no retry
+    # loop is needed. The file is mapped rather than read: orjson parses
+    # straight out of the page cache via the buffer protocol, skipping the
+    # intermediate bytes copy f.read() would allocate. Parsing still runs
+    # after the lock is released to keep the critical section short — the
+    # producer publishes by atomic rename, so the mapped inode never mutates
+    # under us. The stdlib fallback needs a real bytes object, so only that
+    # path pays for the copy.
+    with open(state_path, "rb") as f:
+        fcntl.flock(f, fcntl.LOCK_SH)
+        try:
+            st = os.fstat(f.fileno())
+            key = (state_path, st.st_size, st.st_mtime_ns)
+            if key == _state_cache[0]:
+                return _state_cache[1]
+            mm = mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ)
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+    with mm:
+        # orjson rejects mmap objects; a memoryview satisfies its input check
+        # while still reading straight from the mapping. The temporary view is
+        # released when the call returns, so closing the map stays legal.
+        parsed = _json_loads(memoryview(mm) if orjson is not None else mm[:])
+    _state_cache = (key, parsed)
+    return parsed
+
+# The Discord channel ID → iMessage GUID map is published as an immutable
+# MappingProxyType and swapped wholesale on change, so the message handler
+# reads it without taking any lock.
+
+def iter_chat_entries(state_path):
+    """Yield (chat_guid, chat_info) pairs from state.json.
+
+    The responder only consumes chats[*].discord_channel_id, so with ijson
+    installed the entries stream through the parser one chat at a time and
+    memory stays O(channels) instead of O(state file). A fresh msgpack
+    sidecar or a still-valid cached parse is cheaper than any streaming,
+    though, so those are consulted first; ijson covers the cold-cache,
+    JSON-only case. Without ijson the whole file is parsed and immediately
+    reduced to its entries.
+    """
+    if ijson is None or _sidecar_is_fresh(state_path):
+        yield from read_state_file(state_path).get("chats", {}).items()
+        return
+    cached = _cached_parse(state_path)
+    if cached is not None:
+        yield from cached.get("chats", {}).items()
+        return
+    with open(state_path, "rb") as f:
+        fcntl.flock(f, fcntl.LOCK_SH)
+        try:
+            yield from ijson.kvitems(f, "chats")
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+# chat_guid -> discord_channel_id as of the last refresh, used to diff
+# reloads so unchanged publishes cost no map rebuild or swap
+_chat_channels = {}
+
+def refresh_channel_map(current_map, state_path):
+    """Return an updated channel map, or current_map itself if nothing changed.
+
+    Entries are diffed against the previous guid->channel mapping so only
+    added, changed, or removed chats touch the new dict.
+    """
+    global _chat_channels
+    # Discord IDs are ints on the wire; keying by int lets on_message look up
+    # message.channel.id directly with no per-message str() conversion
+    seen = {
+        chat_guid: int(chat_info["discord_channel_id"])
+        for chat_guid, chat_info in iter_chat_entries(state_path)
+        if "discord_channel_id" in chat_info
+    }
+    if seen == _chat_channels:
+        return current_map
+    new_map = dict(current_map)
+    for chat_guid, channel_id in seen.items():
+        previous = _chat_channels.get(chat_guid)
+        if previous != channel_id:
+            if previous is not None:
+                new_map.pop(previous, None)
+            new_map[channel_id] = chat_guid
+    for chat_guid, previous in _chat_channels.items():
+        if chat_guid not in seen:
+            new_map.pop(previous, None)
+    _chat_channels = seen
+    return MappingProxyType(new_map)
 
 try:
-    state = read_state_file(STATE_PATH)  # Use the locking mechanism for the initial load
+    channel_to_chat = refresh_channel_map(MappingProxyType({}), STATE_PATH)  # Initial load with locking
 except Exception as e:
     logger.critical(f"Failed to load state.json with locking during startup: {e}")
-    state = {"chats": {}}  # Initialize default state if loading fails
-
-# Build Discord channel ID → iMessage GUID map
-channel_to_chat = {
-    str(chat_info["discord_channel_id"]): chat_guid
-    for chat_guid, chat_info in state.get("chats", {}).items()
-    if "discord_channel_id" in chat_info
-}
+    channel_to_chat = MappingProxyType({})
 
 discord_token = config["discord_bot_token"]
-user_whitelist = config.get("user_id_whitelist", [])  # Optional: list of Discord user IDs allowed to reply
+# Optional: Discord user IDs allowed to reply. A frozenset makes the
+# per-message membership test O(1); entries are normalized to int to match
+# message.author.id whether the config lists them as strings or integers.
+# A malformed entry is skipped with a warning — a config typo should deny
+# one user, not keep the responder from booting.
+def _parse_user_whitelist(entries):
+    ids = set()
+    for entry in entries:
+        try:
+            ids.add(int(entry))
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring non-numeric user_id_whitelist entry: {entry!r}")
+    return frozenset(ids)
+
+user_whitelist = _parse_user_whitelist(config.get("user_id_whitelist", []))
 
 # Setup Discord client
 intents = discord.Intents.default()
 intents.messages = True
 intents.message_content = True
+# Typing and presence events are high-volume and unused here; dropping the
+# intents keeps them off the gateway connection entirely
+intents.typing = False
+intents.presences = False
 client = discord.Client(intents=intents)
 
+# Channels the bot actually bridges, refreshed alongside channel_to_chat.
+# on_message checks this frozenset first so traffic from every other channel
+# on the server bails out on a single hash probe.
+_active_channel_ids = frozenset(channel_to_chat)
+
 state_lock = asyncio.Lock()
 
+# Version sidecar written by the forwarder after each state.json publish.
+# Comparing this integer (the file-based analogue of SQLite's PRAGMA
+# data_version) lets us skip the full JSON re-parse on redundant events.
+_last_state_version = None
+
+def read_state_version():
+    try:
+        with open(STATE_VERSION_PATH, "r") as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
 async def reload_state():
-    global state, channel_to_chat
+    global channel_to_chat, _active_channel_ids, _last_state_version
     try:
         async with state_lock:
-            state = read_state_file(STATE_PATH)  # Use the new read_state_file function
-            channel_to_chat = {
-                str(chat_info["discord_channel_id"]): chat_guid
-                for chat_guid, chat_info in state.get("chats", {}).items()
-                if "discord_channel_id" in chat_info
-            }
-            logger.info("State reloaded.")
+            version = read_state_version()
+            if version is not None and version == _last_state_version:
+                return  # State has not changed since the last reload
+            new_map = refresh_channel_map(channel_to_chat, STATE_PATH)
+            if new_map is not channel_to_chat:
+                channel_to_chat = new_map
+                _active_channel_ids = frozenset(new_map)
+                logger.info("State reloaded.")
+            _last_state_version = version
     except Exception as e:
         logger.error(f"Failed to reload state: {e}")
 
-class StateFileChangeHandler(FileSystemEventHandler):
+class StateFileChangeHandler(PatternMatchingEventHandler):
+    """Schedules state reloads with debouncing.
+
+    Pattern matching and directory filtering happen inside watchdog's C/thread
+    layer, so events for temp files, logs, and the directory itself never
+    reach Python callbacks here. Atomic-write saves still fire several events
+    per logical publish; restarting a short timer on each collapses a burst
+    into a single reload once the writes go quiet.
+    """
+
+    DEBOUNCE_SECONDS = 0.05
+
+    # The version sidecar is bumped after state.json/state.msgpack are
+    # published, so reacting to any of the three catches the update;
+    # reload_state itself dedupes via the version check
+    PATTERNS = ["*state.json", "*state.msgpack", "*state.version"]
+
+    def __init__(self, loop):
+        super().__init__(patterns=self.PATTERNS, ignore_directories=True)
+        # The loop is captured once at setup; the watchdog thread must not
+        # call asyncio.get_event_loop() itself (deprecated off-loop, and a
+        # thread-local lookup per event besides)
+        self._loop = loop
+        self._pending = None  # asyncio.TimerHandle for the scheduled reload
+
+    def on_closed(self, event):
+        # IN_CLOSE_WRITE: the definitive "writer finished" signal on Linux
+        self._schedule()
+
+    def on_moved(self, event):
+        # Atomic publishes land as a rename onto the watched name
+        self._schedule()
+
     def on_modified(self, event):
-        if event.src_path.endswith("state.json"):
-            asyncio.run_coroutine_threadsafe(reload_state(), asyncio.get_event_loop())
-            logger.info("State file changed. Reloaded state.")
+        self._schedule()
+
+    def _schedule(self):
+        self._loop.call_soon_threadsafe(self._restart_timer)
 
-def start_file_watcher():
-    event_handler = StateFileChangeHandler()
+    def _restart_timer(self):
+        # Runs on the event loop thread, so no locking around _pending
+        if self._pending is not None:
+            self._pending.cancel()
+        self._pending = self._loop.call_later(self.DEBOUNCE_SECONDS, self._fire)
+
+    def _fire(self):
+        self._pending = None
+        asyncio.ensure_future(reload_state())
+        logger.info("State file changed. Reloading state.")
+
+def start_file_watcher(loop):
+    event_handler = StateFileChangeHandler(loop)
     observer = Observer()
     observer.schedule(event_handler, path=os.path.dirname(STATE_PATH), recursive=False)
     observer.start()
     logger.info("Started watching state.json for changes.")
     return observer
 
+_observer = None
+
+async def _setup_hook():
+    # client.run drives a loop created by asyncio.run, so the loop the
+    # handler must target only exists once the client is starting up;
+    # setup_hook runs inside it, making get_running_loop the correct capture
+    # point.
+    global _observer
+    _observer = start_file_watcher(asyncio.get_running_loop())
+
+client.setup_hook = _setup_hook
+
 @client.event
 async def on_ready():
     logger.info(f"Responder is online as {client.user}.")
     await reload_state()
+    # Warm the persistent osascript worker now so the first relayed message
+    # doesn't pay the interpreter fork+exec and Messages.app bootstrap cost.
+    try:
+        async with _osa_worker_lock:
+            await _get_osa_worker()
+    except OSError as e:
+        logger.warning(f"Could not pre-spawn osascript worker: {e}")
 
 @client.event
 async def on_message(message):
     try:
+        # Cheapest rejection first: most traffic on a busy server is for
+        # channels the bridge doesn't own
+        if message.channel.id not in _active_channel_ids:
+            return
+
         if message.author.bot:
             return
 
-        if user_whitelist and str(message.author.id) not in user_whitelist:
+        if user_whitelist and message.author.id not in user_whitelist:
             try:
                 await message.author.send("You are not authorized to use this bot.")
             except discord.Forbidden:
                 logger.warning(f"Could not send DM to user {message.author.id}.")
             return
 
-        channel_id = str(message.channel.id)
-        if channel_id not in channel_to_chat:
+        chat_map = channel_to_chat  # One atomic read; no lock on the hot path
+        chat_guid = chat_map.get(message.channel.id)
+        if chat_guid is None:
             return
+        enqueue_relay(message.channel.id, chat_guid, message)
+    except Exception as e:
+        logger.error(f"Error handling message: {e}")
+
+# Relays run off the gateway handler: on_message only enqueues, so a slow
+# osascript round-trip never stalls event dispatch. A queue per channel keeps
+# each conversation's messages in order while different channels proceed
+# concurrently, and the semaphore caps how many osascript sends are in flight
+# at once.
+MAX_CONCURRENT_RELAYS = 4
+
+_dispatch_sem = asyncio.Semaphore(MAX_CONCURRENT_RELAYS)
+_relay_queues = {}
+_relay_workers = {}
+
+# Cap on how many queued messages are folded into one worker exchange
+MAX_RELAY_BATCH = 16
 
-        chat_guid = channel_to_chat[channel_id]
-        success = await send_imessage_async(chat_guid, message.content)
+async def _relay_batch(chat_guid, batch, queue):
+    try:
+        async with _dispatch_sem:
+            success = await send_imessage_batch_async(chat_guid, [m.content for m in batch])
         if success:
-            logger.info(f"Relayed from Discord: '{message.content}' → {chat_guid}")
+            for m in batch:
+                logger.info(f"Relayed from Discord: '{m.content}' → {chat_guid}")
         else:
-            await message.channel.send("**Error:** Failed to send iMessage from bot.")
+            await batch[0].channel.send("**Error:** Failed to send iMessage from bot.")
     except Exception as e:
-        logger.error(f"Error handling message: {e}")
+        logger.error(f"Error relaying message to {chat_guid}: {e}")
+    finally:
+        for _ in batch:
+            queue.task_done()
 
-async def send_imessage_async(chat_guid, message):
-    sanitized_message = message.replace('"', '\\"').replace("\\", "\\\\").replace("\n", "\\n")
-    if len(sanitized_message) > 1000:  # Example limit
-        sanitized_message = sanitized_message[:997] + "..."
-        logger.warning("Message truncated due to excessive length.")
-    script = '''
-    on run {chatID, messageText}
-        set safeMessage to quoted form of messageText
+async def _drain_relay_queue(channel_id):
+    queue = _relay_queues[channel_id]
+    carry = None
+    while True:
+        chat_guid, message = carry if carry is not None else await queue.get()
+        carry = None
+        # Coalesce whatever else has already queued up for this chat: a burst
+        # that arrived while the previous send was in flight goes out as one
+        # worker exchange instead of one pipe round-trip per message. Nothing
+        # waits — only messages already in the queue are folded in.
+        batch = [message]
+        while len(batch) < MAX_RELAY_BATCH:
+            try:
+                item = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if item[0] != chat_guid:
+                carry = item  # channel was remapped mid-burst; new batch next
+                break
+            batch.append(item[1])
+        await _relay_batch(chat_guid, batch, queue)
+
+def enqueue_relay(channel_id, chat_guid, message):
+    queue = _relay_queues.get(channel_id)
+    if queue is None:
+        queue = _relay_queues[channel_id] = asyncio.Queue()
+        _relay_workers[channel_id] = asyncio.create_task(_drain_relay_queue(channel_id))
+    queue.put_nowait((chat_guid, message))
+
+# Driver for the long-lived osascript worker. Records arrive on stdin as
+# chatID <US> message <RS> (unit/record separator control characters, so the
+# message text itself never needs quoting); each send is acknowledged with an
+# "OK"/"ERR" line via log (stderr). Keeping one osascript alive amortizes the
+# interpreter fork+exec and Messages.app IPC bootstrap across all sends.
+#
+# The one-shot fallback script is a module constant for the same reason the
+# worker source is: building the literal per call just re-allocated an
+# identical string on every send.
+_OSA_ONESHOT_SRC = '''
+on run {chatID}
+    set messageText to system attribute "IMSG_TEXT"
+    tell application "Messages"
+        send messageText to chat id chatID
+    end tell
+end run
+'''
+
+_OSA_WORKER_SRC = '''
+set fieldSep to (character id 31)
+set recordSep to (character id 30)
+set stdinRef to open for access "/dev/stdin"
+repeat
+    try
+        set rec to read stdinRef before (character id 30) as «class utf8»
+    on error
+        exit repeat
+    end try
+    set AppleScript's text item delimiters to fieldSep
+    set parts to text items of rec
+    try
         tell application "Messages"
-            send safeMessage to chat id chatID
+            send (item 2 of parts) to chat id (item 1 of parts)
         end tell
-    end run
-    '''
+        log "OK"
+    on error errMsg
+        log "ERR " & errMsg
+    end try
+end repeat
+'''
+
+_osa_worker = None
+_osa_worker_lock = asyncio.Lock()
+
+async def _get_osa_worker():
+    global _osa_worker
+    if _osa_worker is None or _osa_worker.returncode is not None:
+        _osa_worker = await asyncio.create_subprocess_exec(
+            "osascript", "-e", _OSA_WORKER_SRC,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        logger.info("Started persistent osascript worker.")
+    return _osa_worker
+
+async def _kill_osa_worker():
+    global _osa_worker
+    if _osa_worker is not None and _osa_worker.returncode is None:
+        _osa_worker.kill()
+    _osa_worker = None
+
+# Maps the worker protocol's record/unit separators to spaces
+_FRAME_STRIP = str.maketrans({"\x1e": " ", "\x1f": " "})
+
+async def send_imessage_async(chat_guid, message):
+    return await send_imessage_batch_async(chat_guid, [message])
+
+async def send_imessage_batch_async(chat_guid, messages):
+    """Send one or more messages to a chat in a single worker exchange.
+
+    All records go out in one stdin flush and the acks are read back
+    afterwards, so a burst costs one pipe round-trip instead of one per
+    message. The worker still sends each record as its own iMessage.
+    """
+    records = bytearray()
+    for message in messages:
+        # Strip the framing control characters; they never occur in real
+        # text, so the membership test keeps the common case to two C-level
+        # scans with no string copies, and the rare hit pays one translate
+        # pass instead of a replace per character
+        if "\x1e" in message or "\x1f" in message:
+            message = message.translate(_FRAME_STRIP)
+        records += f"{chat_guid}\x1f{message}\x1e".encode()
+    async with _osa_worker_lock:
+        try:
+            worker = await _get_osa_worker()
+            worker.stdin.write(bytes(records))
+            await worker.stdin.drain()
+            failed = None
+            for _ in messages:
+                ack = await worker.stderr.readline()
+                if ack.strip() != b"OK":
+                    failed = ack
+                    break
+            if failed is None:
+                return True
+            logger.error(f"osascript worker error: {failed.decode(errors='replace').strip()}")
+            await _kill_osa_worker()
+        except (OSError, ConnectionError) as e:
+            logger.warning(f"osascript worker failed ({e}); falling back to one-shot osascript.")
+            await _kill_osa_worker()
+    # Fallback replays the whole batch one message at a time; a re-send of the
+    # few that may already have gone out beats silently dropping the rest
+    results = [await _send_imessage_oneshot(chat_guid, m) for m in messages]
+    return all(results)
+
+async def _send_imessage_oneshot(chat_guid, message):
+    """Fallback path: spawn one osascript per message, as before."""
+    # The text travels in an environment variable rather than argv, so no
+    # escaping or length cap is needed on the Python side: AppleScript reads
+    # it back verbatim via `system attribute` and the string never crosses a
+    # shell or script-source boundary.
     process = await asyncio.create_subprocess_exec(
-        "osascript", "-e", script, "--args", chat_guid, message,
+        "osascript", "-e", _OSA_ONESHOT_SRC, "--args", chat_guid,
+        env={**os.environ, "IMSG_TEXT": message},
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE
     )
@@ -190,8 +604,10 @@ async def shutdown(observer):
     logger.info("Responder shut down gracefully.")
 
 if __name__ == "__main__":
-    observer = start_file_watcher()
     try:
         client.run(discord_token)
     except KeyboardInterrupt:
-        asyncio.run(shutdown(observer))
+        if _observer is not None:
+            asyncio.run(shutdown(_observer))
+    finally:
+        _log_listener.stop()  # Flush queued records before exit